@@ -14,14 +14,26 @@ Calculator MCP Server
 
 模块常量：
     CHARACTER_LIMIT: 响应内容的最大字符数限制，防止超长输出
+    VECTORIZE_THRESHOLD: 方差与标准差切换到 NumPy 向量化实现的数据量阈值
+    MEDIAN_VECTORIZE_THRESHOLD: 中位数切换到 NumPy 向量化实现的数据量阈值
+    DATA_ECHO_LIMIT: 计算步骤中完整回显输入数据的最大数据点数量
 """
 
 # ========== 标准库导入 ==========
 import ast
+import json
+import keyword
+import operator
 import re
+import sys
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from fractions import Fraction
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 # ========== 数学与统计库导入 ==========
 import math
@@ -31,11 +43,120 @@ import statistics
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
+# ========== 可选依赖导入 ==========
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时回退到纯 Python 实现
+    np = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用标准库 json 序列化
+    orjson = None  # type: ignore[assignment]
+
 # ========== MCP 服务器实例 ==========
 mcp = FastMCP("calculator_mcp")
 
 # ========== 模块级常量 ==========
 CHARACTER_LIMIT = 25000  # 最大响应字符数，防止超长输出
+VECTORIZE_THRESHOLD = 128  # 数据点数量达到该值时使用 NumPy 计算方差与标准差
+MEDIAN_VECTORIZE_THRESHOLD = 1024  # 数据点数量达到该值时使用 NumPy 计算中位数
+DATA_ECHO_LIMIT = 100  # 超过该数据点数量时，计算步骤中仅显示数据摘要
+
+
+# 二元运算符分派表（AST 运算符类型 -> C 实现的运算函数）
+_BINARY_OPERATORS: Dict[type, Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+# 一元运算符分派表（AST 运算符类型 -> C 实现的运算函数）
+_UNARY_OPERATORS: Dict[type, Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# 需要进行零除检查的运算符类型
+_DIVISION_OPERATORS = (ast.Div, ast.FloorDiv, ast.Mod)
+
+def _safe_sum(values: List[float]) -> float:
+    """计算列表元素之和（白名单中的 sum 函数，用法为 sum([1, 2, 3])）。
+
+    使用 math.fsum 精确求和，如 sum([0.1, 0.2, 0.3]) 得到 0.6；
+    中间结果溢出或出现 inf - inf 时 math.fsum 会抛出异常，
+    此时回退到内置 sum，结果为 inf 或 nan。
+
+    Args:
+        values: 数值列表
+
+    Returns:
+        列表元素之和
+    """
+    try:
+        return math.fsum(values)
+    except (OverflowError, ValueError):
+        return float(sum(values))
+
+
+# 安全函数白名单
+_SAFE_FUNCTIONS: Dict[str, Callable[..., float]] = {
+    # 基础数学函数
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'log': math.log,
+    'log10': math.log10,
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'round': round,
+    'pow': pow,
+
+    # 统计函数
+    'mean': statistics.mean,
+    'median': statistics.median,
+    'mode': statistics.mode,
+    'stdev': statistics.stdev,
+    'variance': statistics.variance,
+
+    # 聚合函数
+    'min': min,
+    'max': max,
+    'sum': _safe_sum,
+    'len': len,
+}
+
+# 安全常数白名单
+_SAFE_CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+    'tau': math.tau,
+}
+
+# 方程右侧简单表达式求值时允许使用的名称（只读视图，防止求值过程中被修改）
+_SIMPLE_EVAL_NAMES = MappingProxyType({
+    'pi': math.pi,
+    'e': math.e,
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'pow': pow,
+})
+
+# 方程变量名校验正则（与 CalculateInput.variable 的 pattern 一致）
+_VARIABLE_NAME_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+
+# 统计函数调用检测正则（一次扫描匹配全部统计函数名）
+_STAT_FUNCTION_RE = re.compile(r'(?:mean|median|mode|stdev|variance)\(')
+
+# 变量名检测正则（用于识别线性方程）
+_VARIABLE_RE = re.compile(r'[a-zA-Z]\w*')
+
+# 统计函数调用解析正则，格式为 function([data_list])
+_STAT_CALL_RE = re.compile(r'(\w+)\(\[(.*?)\]\)')
 
 
 # ========== 数据模型定义 ==========
@@ -54,7 +175,10 @@ class CalculationResult(BaseModel):
     operation: str = Field(description="操作类型")
     result: float = Field(description="计算结果")
     numbers: List[float] = Field(description="参与计算的数字列表")
-    timestamp: str = Field(description="计算时间戳")
+    timestamp: str = Field(
+        default_factory=lambda: datetime.now().isoformat(),
+        description="计算时间戳"
+    )
 
 
 class StatisticsResult(BaseModel):
@@ -87,11 +211,22 @@ class ResponseFormat(str, Enum):
     JSON = "json"
 
 
-class UnifiedCalculationResult(BaseModel):
+# 批量计算期间共享的时间戳（上下文变量，并发请求之间互不影响）
+_BATCH_TIMESTAMP: ContextVar[Optional[str]] = ContextVar("_BATCH_TIMESTAMP", default=None)
+
+
+def _current_timestamp() -> str:
+    """返回计算时间戳；批量计算期间返回整个批次共享的时间戳。"""
+    return _BATCH_TIMESTAMP.get() or datetime.now().isoformat()
+
+
+@dataclass(slots=True)
+class UnifiedCalculationResult:
     """统一计算结果数据模型。
     
     通用的计算结果封装模型，支持多种计算类型的结果表示。
-    包含严格的数据验证规则和可选的扩展字段。
+    结果仅在服务内部构建并立即序列化为响应，因此使用带 slots 的
+    dataclass 而非 Pydantic 模型，构建时不做逐字段验证。
     
     Attributes:
         operation: 操作类型标识
@@ -105,53 +240,16 @@ class UnifiedCalculationResult(BaseModel):
         truncated: 响应是否因长度限制被截断
         truncation_message: 截断时的提示信息
     """
-    model_config = ConfigDict(
-        str_strip_whitespace=True,    # 自动去除字符串首尾空白
-        validate_assignment=True,     # 启用赋值验证
-        extra='forbid'                # 禁止额外字段
-    )
-
-    operation: str = Field(
-        description="操作类型",
-        min_length=1,
-        max_length=50
-    )
-    expression: str = Field(
-        description="原始表达式",
-        min_length=1,
-        max_length=1000
-    )
-    result: Union[float, List[float], Dict[str, Any]] = Field(
-        description="计算结果"
-    )
-    timestamp: str = Field(
-        description="计算时间戳"
-    )
-    steps: Optional[List[str]] = Field(
-        default=None,
-        description="计算步骤"
-    )
-    data: Optional[List[float]] = Field(
-        default=None,
-        description="输入数据（统计计算时）"
-    )
-    batch_results: Optional[List['UnifiedCalculationResult']] = Field(
-        default=None,
-        description="批量计算结果"
-    )
-    error: Optional[str] = Field(
-        default=None,
-        description="错误信息（如果有）",
-        max_length=500
-    )
-    truncated: Optional[bool] = Field(
-        default=False,
-        description="响应是否被截断"
-    )
-    truncation_message: Optional[str] = Field(
-        default=None,
-        description="截断提示信息"
-    )
+    operation: str  # 操作类型
+    expression: str  # 原始表达式
+    result: Union[float, List[float], Dict[str, Any]]  # 计算结果
+    timestamp: str = field(default_factory=_current_timestamp)  # 计算时间戳
+    steps: Optional[List[str]] = None  # 计算步骤
+    data: Optional[List[float]] = None  # 输入数据（统计计算时）
+    batch_results: Optional[List['UnifiedCalculationResult']] = None  # 批量计算结果
+    error: Optional[str] = None  # 错误信息（如果有）
+    truncated: Optional[bool] = False  # 响应是否被截断
+    truncation_message: Optional[str] = None  # 截断提示信息
 
 
 class CalculateInput(BaseModel):
@@ -163,6 +261,11 @@ class CalculateInput(BaseModel):
         expression: 数学表达式或方程字符串
         variable: 线性方程中的变量名（默认为 "x"）
         response_format: 输出格式选择（Markdown 或 JSON）
+    
+    Note:
+        calculate 工具会先执行与本模型等价的轻量检查，
+        仅在检查未通过时实例化本模型以生成详细的错误信息。
+        修改字段约束时需同步更新 calculate 中的检查逻辑。
     """
     model_config = ConfigDict(
         str_strip_whitespace=True,    # 自动去除字符串首尾空白
@@ -217,6 +320,360 @@ class CalculateInput(BaseModel):
         return v.strip()
 
 
+# ========== 内部辅助函数 ==========
+
+@lru_cache(maxsize=512)
+def _parse_expression(expression: str) -> ast.expr:
+    """解析表达式并缓存其 AST 主体节点。
+
+    相同的表达式字符串只会被 ast.parse 解析一次，后续调用直接复用缓存的语法树。
+    AST 节点在求值过程中不会被修改，因此可以安全地共享。
+
+    Args:
+        expression: 数学表达式字符串
+
+    Returns:
+        表达式对应的 AST 主体节点
+
+    Raises:
+        SyntaxError: 当表达式无法解析时抛出（异常结果不会被缓存）
+    """
+    return ast.parse(expression, mode='eval').body
+
+
+def _linear_mul(left: Tuple[float, float],
+                right: Tuple[float, float]) -> Tuple[float, float]:
+    """计算两个线性项的乘积，要求至少一侧不含变量。"""
+    if left[0] and right[0]:
+        raise ValueError("方程必须是线性的")
+    return left[0] * right[1] + right[0] * left[1], left[1] * right[1]
+
+
+def _linear_div(left: Tuple[float, float],
+                right: Tuple[float, float]) -> Tuple[float, float]:
+    """计算两个线性项的商，要求除数为不含变量的非零常数。"""
+    if right[0]:
+        raise ValueError("方程必须是线性的")
+    if right[1] == 0:
+        raise ValueError("除数不能为零")
+    return left[0] / right[1], left[1] / right[1]
+
+
+# 线性项二元运算分派表（AST 运算符类型 -> (系数, 常数项) 合并函数）
+_LINEAR_OPERATORS = {
+    ast.Add: lambda left, right: (left[0] + right[0], left[1] + right[1]),
+    ast.Sub: lambda left, right: (left[0] - right[0], left[1] - right[1]),
+    ast.Mult: _linear_mul,
+    ast.Div: _linear_div,
+}
+
+
+def _linear_terms(node: ast.AST, variable: str) -> Tuple[float, float]:
+    """递归提取 AST 节点表示的线性表达式的系数与常数项。
+
+    每个节点被视为 a·variable + b 的形式，返回 (a, b)。
+    乘法和除法要求至少一侧不含变量，以保证表达式保持线性。
+
+    Args:
+        node: AST 节点对象
+        variable: 方程中的未知变量名
+
+    Returns:
+        (系数, 常数项) 二元组
+
+    Raises:
+        ValueError: 当遇到不支持的节点、非线性项或除数为零时
+    """
+    # 处理数值常量
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (int, float)):
+            return 0.0, float(node.value)
+        raise ValueError(f"不支持的常量类型: {type(node.value)}")
+
+    # 处理变量引用（仅允许方程变量）
+    if isinstance(node, ast.Name):
+        if node.id == variable:
+            return 1.0, 0.0
+        raise ValueError(f"不支持的变量或常数: {node.id}")
+
+    # 处理一元运算符
+    if isinstance(node, ast.UnaryOp):
+        coeff, constant = _linear_terms(node.operand, variable)
+        if isinstance(node.op, ast.USub):
+            return -coeff, -constant
+        if isinstance(node.op, ast.UAdd):
+            return coeff, constant
+        raise ValueError(f"不支持的一元运算符: {type(node.op)}")
+
+    # 处理二元运算符
+    if isinstance(node, ast.BinOp):
+        combine = _LINEAR_OPERATORS.get(type(node.op))
+        if combine is None:
+            raise ValueError(f"不支持的运算符: {type(node.op)}")
+        return combine(_linear_terms(node.left, variable),
+                       _linear_terms(node.right, variable))
+
+    raise ValueError(f"不支持的AST节点类型: {type(node)}")
+
+
+@lru_cache(maxsize=16)
+def _implicit_mul_pattern(variable: str) -> re.Pattern:
+    """编译并缓存用于补全省略乘号（如 "2x"）的正则表达式。
+
+    Args:
+        variable: 方程中的未知变量名
+
+    Returns:
+        匹配数字或右括号与变量之间位置的已编译正则
+    """
+    return re.compile(rf'(?<=[\d.)])\s*(?={re.escape(variable)}(?!\w))')
+
+
+# 默认变量名 x 的预编译正则，导入时即完成编译
+_IMPLICIT_MUL_X = _implicit_mul_pattern('x')
+
+
+@lru_cache(maxsize=256)
+def _parse_linear_side(side: str, variable: str) -> Tuple[float, float]:
+    """解析线性方程的一侧，返回变量系数与常数项。
+
+    先为 "2x"、"(1+2)x" 这类省略乘号的写法补全乘号，
+    再通过一次 AST 遍历累加系数和常数项。结果按 (side, variable) 缓存。
+
+    Args:
+        side: 方程一侧的表达式字符串
+        variable: 方程中的未知变量名
+
+    Returns:
+        (系数, 常数项) 二元组
+
+    Raises:
+        ValueError: 当表达式无法解析（如变量名与方程不符）或不是线性表达式时抛出
+    """
+    # 补全数字或右括号与变量之间省略的乘号
+    pattern = _IMPLICIT_MUL_X if variable == 'x' else _implicit_mul_pattern(variable)
+    source = pattern.sub('*', side)
+
+    # 变量名为 Python 关键字（如 in、if、or）时无法直接解析，
+    # 先替换为未在表达式中出现的占位标识符
+    name = variable
+    if keyword.iskeyword(variable):
+        name = '_' + variable
+        while name in side:
+            name = '_' + name
+        source = re.sub(rf'(?<!\w){re.escape(variable)}(?!\w)', name, source)
+
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError:
+        raise ValueError(
+            f"无法将 '{side}' 解析为关于变量 {variable} 的线性表达式，请检查变量名与表达式格式"
+        ) from None
+    coeff, constant = _linear_terms(tree.body, name)
+    # 加 0.0 将取负产生的 -0.0（如 "-x" 的常数项）规范为 0.0，避免步骤中出现 "+ -0.0"
+    return coeff, constant + 0.0
+
+
+@lru_cache(maxsize=1024)
+def _detect_expression_type(expression: str) -> str:
+    """检测表达式类型并按表达式字符串缓存结果。
+
+    检测只依赖模块级正则，与计算器实例无关，因此在模块级缓存。
+    检测规则见 UnifiedCalculator.detect_expression_type。
+
+    Args:
+        expression: 待检测的表达式字符串
+
+    Returns:
+        表达式类型标识
+    """
+    expression = expression.strip()
+
+    # 检查是否为线性方程（包含等号和变量）
+    if '=' in expression and _VARIABLE_RE.search(expression):
+        return "linear_equation"
+
+    # 检查是否为批量计算（包含分号）
+    if ';' in expression:
+        return "batch_calculation"
+
+    # 检查是否为统计函数
+    if _STAT_FUNCTION_RE.search(expression):
+        return "statistics"
+
+    # 默认为表达式计算
+    return "expression"
+
+
+# NumPy 向量化统计函数及其启用所需的最小数据量
+# （实测 mean 在任何规模下 math.fsum 都更快；median 的排序在数据量较小时
+#  纯 Python 更快；mode 没有等价的 NumPy 实现，始终使用 statistics 模块）
+_NUMPY_STATISTICS: Dict[str, Tuple[int, Callable[[Any], float]]] = {
+    'median': (MEDIAN_VECTORIZE_THRESHOLD, lambda arr: float(np.median(arr))),
+    'stdev': (VECTORIZE_THRESHOLD, lambda arr: float(arr.std(ddof=1))),
+    'variance': (VECTORIZE_THRESHOLD, lambda arr: float(arr.var(ddof=1))),
+}
+
+
+def _float_mean(data: Tuple[float, ...]) -> float:
+    """使用 math.fsum 计算算术平均值。
+
+    statistics.mean 会将每个数据点转换为 Fraction，速度较慢；
+    这里用 math.fsum 精确求和，只在最后一次除法中使用 Fraction，
+    结果与 statistics.mean 相同。
+
+    Args:
+        data: 数据元组
+
+    Returns:
+        算术平均值
+
+    Raises:
+        ValueError: 当数据为空时抛出
+    """
+    if not data:
+        raise ValueError("数据不能为空")
+    # math.fsum 返回的是舍入后的和，直接除以 n 会二次舍入
+    # （如 mean([0.1, 0.2, 0.3]) 得到 0.19999999999999998）；
+    # 因此继续累加剩余的舍入残差，直到这些部分之和精确等于数据总和
+    try:
+        parts = [math.fsum(data)]
+        while math.isfinite(parts[-1]):
+            residual = math.fsum([*data, *(-part for part in parts)])
+            if not residual:
+                return float(sum(map(Fraction, parts), Fraction(0)) / len(data))
+            parts.append(residual)
+    except OverflowError:
+        pass
+    # 中间和溢出（如 mean([1e308, 1e308])）或数据包含 inf/nan 时回退到 statistics 模块
+    return statistics.mean(data)
+
+
+def _fsum_variance(data: Tuple[float, ...]) -> Optional[float]:
+    """使用两遍 math.fsum 算法计算样本方差。
+
+    先求均值再累加离差平方，避免 statistics.variance 的 Fraction 运算开销，
+    同时比单遍公式具有更好的数值稳定性。
+
+    Args:
+        data: 至少包含两个数据点的元组
+
+    Returns:
+        样本方差（自由度为 n - 1）；中间结果溢出或结果非有限时返回 None
+    """
+    try:
+        mean = math.fsum(data) / len(data)
+        variance = math.fsum((x - mean) ** 2 for x in data) / (len(data) - 1)
+    except OverflowError:
+        return None
+    return variance if math.isfinite(variance) else None
+
+
+def _sample_variance(data: Tuple[float, ...]) -> float:
+    """计算样本方差，无法使用快速算法时回退到 statistics.variance。
+
+    Args:
+        data: 至少包含两个数据点的元组
+
+    Returns:
+        样本方差（自由度为 n - 1）
+    """
+    variance = _fsum_variance(data)
+    return statistics.variance(data) if variance is None else variance
+
+
+def _sample_stdev(data: Tuple[float, ...]) -> float:
+    """计算样本标准差，无法使用快速算法时回退到 statistics.stdev。
+
+    离差平方溢出（如 stdev([1e200, -1e200])）时标准差本身仍可能是有限值，
+    statistics.stdev 在精确运算后再开方，可以得到该结果。
+
+    Args:
+        data: 至少包含两个数据点的元组
+
+    Returns:
+        样本标准差
+    """
+    variance = _fsum_variance(data)
+    return statistics.stdev(data) if variance is None else math.sqrt(variance)
+
+
+def _describe_data(data: List[float]) -> str:
+    """生成统计计算步骤中的数据说明。
+
+    数据点数量不超过 DATA_ECHO_LIMIT 时完整回显，
+    否则仅显示数量与首末项，避免格式化整个大列表。
+
+    Args:
+        data: 输入数据列表
+
+    Returns:
+        数据说明字符串
+    """
+    if len(data) <= DATA_ECHO_LIMIT:
+        return f"数据: {data}"
+    return f"数据: 共 {len(data)} 个数据点（{data[0]}, ..., {data[-1]}）"
+
+
+# 统计函数名 -> 纯 Python 实现的分派表
+_STAT_DISPATCH: Dict[str, Callable[[Tuple[float, ...]], float]] = {
+    'mean': _float_mean,
+    'median': statistics.median,
+    'mode': statistics.mode,
+    'stdev': lambda data: _sample_stdev(data) if len(data) > 1 else 0.0,
+    'variance': lambda data: _sample_variance(data) if len(data) > 1 else 0.0,
+}
+
+
+@lru_cache(maxsize=256)
+def _compute_statistic(func_name: str, data: Tuple[float, ...]) -> float:
+    """计算统计指标并缓存结果。
+
+    统计计算是纯函数，相同的函数名和数据会直接返回缓存的结果。
+    数据以元组形式传入以便作为缓存键；缓存键包含完整的数据元组，
+    因此缓存容量保持较小，避免长时间运行的服务占用过多内存。
+
+    Args:
+        func_name: 统计函数名（mean、median、mode、stdev、variance）
+        data: 数据元组
+
+    Returns:
+        统计计算结果
+
+    Raises:
+        ValueError: 当统计函数不受支持时抛出
+    """
+    # 数据量较大时使用 NumPy 向量化实现
+    if np is not None and func_name in _NUMPY_STATISTICS:
+        min_size, numpy_func = _NUMPY_STATISTICS[func_name]
+        if len(data) >= min_size:
+            return numpy_func(np.asarray(data, dtype=np.float64))
+
+    stat_func = _STAT_DISPATCH.get(func_name)
+    if stat_func is None:
+        raise ValueError(f"不支持的统计函数: {func_name}")
+    return stat_func(data)
+
+
+def _json_dumps(obj: Dict[str, Any], fast: bool = True) -> str:
+    """将响应字典序列化为缩进两格的 JSON 字符串。
+
+    安装 orjson 时使用其 C 实现，批量结果较大时明显快于标准库。
+    orjson 会将 NaN 与 Infinity 输出为 null，因此包含非有限数值的
+    响应应传入 fast=False，使用标准库保持原有输出。
+
+    Args:
+        obj: 待序列化的响应字典
+        fast: 是否允许使用 orjson
+
+    Returns:
+        JSON 字符串
+    """
+    if fast and orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
 # ========== 核心计算器类 ==========
 
 class UnifiedCalculator:
@@ -233,48 +690,21 @@ class UnifiedCalculator:
         - 批量计算处理
     
     Attributes:
-        safe_functions: 安全的数学函数白名单字典
-        safe_constants: 安全的数学常数白名单字典
+        safe_functions: 安全的数学函数白名单（只读映射）
+        safe_constants: 安全的数学常数白名单（只读映射）
     """
 
-    def __init__(self):
-        """初始化计算器实例。
-        
-        设置安全的函数和常数白名单，用于表达式求值时的安全检查。
-        """
-        # 安全函数白名单
-        self.safe_functions = {
-            # 基础数学函数
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'log': math.log,
-            'log10': math.log10,
-            'sqrt': math.sqrt,
-            'abs': abs,
-            'round': round,
-            'pow': pow,
-
-            # 统计函数
-            'mean': statistics.mean,
-            'median': statistics.median,
-            'mode': statistics.mode,
-            'stdev': statistics.stdev,
-            'variance': statistics.variance,
-
-            # 聚合函数
-            'min': min,
-            'max': max,
-            'sum': sum,
-            'len': len,
-        }
-
-        # 安全常数白名单
-        self.safe_constants = {
-            'pi': math.pi,
-            'e': math.e,
-            'tau': math.tau,
-        }
+    # 安全函数与常数白名单（类级只读视图，所有实例共享，防止运行时被修改）
+    safe_functions = MappingProxyType(_SAFE_FUNCTIONS)
+    safe_constants = MappingProxyType(_SAFE_CONSTANTS)
+
+    # 表达式类型 -> 计算方法的分派表，参数为 (实例, 表达式, 方程变量名)
+    _HANDLERS: Dict[str, Callable[["UnifiedCalculator", str, str], UnifiedCalculationResult]] = {
+        "linear_equation": lambda self, expr, variable: self.solve_linear_equation(expr, variable),
+        "batch_calculation": lambda self, expr, variable: self.process_batch(expr),
+        "statistics": lambda self, expr, variable: self.calculate_statistics(expr),
+        "expression": lambda self, expr, variable: self.evaluate_expression(expr),
+    }
 
     def detect_expression_type(self, expression: str) -> str:
         """自动检测表达式类型。
@@ -297,23 +727,20 @@ class UnifiedCalculator:
                 - "statistics": 统计计算
                 - "expression": 数学表达式
         """
-        expression = expression.strip()
-
-        # 检查是否为线性方程（包含等号和变量）
-        if '=' in expression and re.search(r'[a-zA-Z]\w*', expression):
-            return "linear_equation"
-
-        # 检查是否为批量计算（包含分号）
-        if ';' in expression:
-            return "batch_calculation"
+        return _detect_expression_type(expression)
 
-        # 检查是否为统计函数
-        stat_functions = ['mean(', 'median(', 'mode(', 'stdev(', 'variance(']
-        if any(func in expression for func in stat_functions):
-            return "statistics"
-
-        # 默认为表达式计算
-        return "expression"
+    def dispatch(self, expression: str, variable: str = "x") -> UnifiedCalculationResult:
+        """检测表达式类型并分派到对应的计算方法。
+        
+        Args:
+            expression: 待计算的表达式字符串
+            variable: 线性方程中的未知变量名（默认为 "x"）
+            
+        Returns:
+            对应计算方法返回的 UnifiedCalculationResult 对象
+        """
+        handler = self._HANDLERS[self.detect_expression_type(expression)]
+        return handler(self, expression, variable)
 
     def evaluate_expression(self, expression: str) -> UnifiedCalculationResult:
         """求值数学表达式。
@@ -331,21 +758,17 @@ class UnifiedCalculator:
             表达式中的统计函数会被自动重定向到 calculate_statistics 方法处理
         """
         # 检查是否包含统计函数
-        stat_functions = ['mean', 'median', 'mode', 'stdev', 'variance']
-        for func in stat_functions:
-            if f"{func}(" in expression:
-                return self.calculate_statistics(expression)
+        if _STAT_FUNCTION_RE.search(expression):
+            return self.calculate_statistics(expression)
 
-        # 使用 AST 解析安全地评估表达式
+        # 使用 AST 解析安全地评估表达式（相同表达式的结果会被缓存）
         try:
-            node = ast.parse(expression, mode='eval')
-            result = self._eval_node(node.body)
+            result = _evaluate_value(expression)
 
             return UnifiedCalculationResult(
                 operation="expression",
                 expression=expression,
                 result=result,
-                timestamp=datetime.now().isoformat(),
                 steps=[
                     f"计算表达式: {expression}",
                     f"结果: {result}"
@@ -356,7 +779,6 @@ class UnifiedCalculator:
                 operation="error",
                 expression=expression,
                 result=float('nan'),
-                timestamp=datetime.now().isoformat(),
                 error=str(e)
             )
 
@@ -390,49 +812,7 @@ class UnifiedCalculator:
             right_value = self._evaluate_simple_expression(right_side)
 
             # 解析左侧的线性表达式（形式：ax + b）
-            coeff = 0      # 变量的系数
-            constant = 0   # 常数项
-
-            # 移除空格以便解析
-            left_side = left_side.replace(' ', '')
-
-            # 使用正则表达式解析左侧表达式
-            pattern = f'([+-]?\\d*\\.?\\d*)\\s*{re.escape(variable)}|([+-]\\d+\\.?\\d*)'
-            matches = re.findall(pattern, left_side)
-
-            # 提取系数和常数项
-            for match in matches:
-                coeff_match, const_match = match
-                if coeff_match and coeff_match != '':
-                    # 这是变量项
-                    if coeff_match == '+' or coeff_match == '':
-                        coeff += 1
-                    elif coeff_match == '-':
-                        coeff -= 1
-                    else:
-                        coeff += float(coeff_match)
-                elif const_match:
-                    # 这是常数项
-                    constant += float(const_match)
-
-            # 如果第一种方法未找到变量项，尝试备用解析
-            if coeff == 0 and variable in left_side:
-                parts = re.split(r'([+-])', left_side)
-                for i in range(len(parts)):
-                    part = parts[i]
-                    if variable in part:
-                        # 提取系数
-                        coeff_str = part.replace(variable, '').replace('*', '')
-                        if coeff_str == '' or coeff_str == '+':
-                            coeff = 1
-                        elif coeff_str == '-':
-                            coeff = -1
-                        else:
-                            coeff = float(coeff_str)
-                    elif part and part not in '+-' and i > 0 and parts[i-1] in '+-':
-                        # 这是常数项
-                        sign = -1 if parts[i-1] == '-' else 1
-                        constant += sign * float(part)
+            coeff, constant = _parse_linear_side(left_side, variable)
 
             # 验证方程有效性
             if coeff == 0:
@@ -445,7 +825,6 @@ class UnifiedCalculator:
                 operation="linear_equation",
                 expression=equation,
                 result=solution,
-                timestamp=datetime.now().isoformat(),
                 steps=[
                     f"原始方程: {equation}",
                     f"解析: {coeff}{variable} + {constant} = {right_value}",
@@ -458,7 +837,6 @@ class UnifiedCalculator:
                 operation="error",
                 expression=equation,
                 result=float('nan'),
-                timestamp=datetime.now().isoformat(),
                 error=f"解方程失败: {str(e)}"
             )
 
@@ -484,37 +862,25 @@ class UnifiedCalculator:
         """
         try:
             # 解析统计函数调用格式：function([data_list])
-            match = re.match(r'(\w+)\(\[(.*?)\]\)', expression)
+            match = _STAT_CALL_RE.match(expression)
             if match:
                 func_name = match.group(1)
                 data_str = match.group(2)
 
-                # 解析数据列表
-                data = [float(x.strip()) for x in data_str.split(',') if x.strip()]
-
-                # 执行对应的统计计算
-                if func_name == 'mean':
-                    result = statistics.mean(data)
-                elif func_name == 'median':
-                    result = statistics.median(data)
-                elif func_name == 'mode':
-                    result = statistics.mode(data)
-                elif func_name == 'stdev':
-                    result = statistics.stdev(data) if len(data) > 1 else 0
-                elif func_name == 'variance':
-                    result = statistics.variance(data) if len(data) > 1 else 0
-                else:
-                    raise ValueError(f"不支持的统计函数: {func_name}")
+                # 解析数据列表（float 会自动忽略首尾空白，无需逐项 strip）
+                data = [float(x) for x in data_str.split(',') if x and not x.isspace()]
+
+                # 执行对应的统计计算（相同函数与数据的结果会被缓存）
+                result = float(_compute_statistic(func_name, tuple(data)))
 
                 return UnifiedCalculationResult(
                     operation="statistics",
                     expression=expression,
                     result=result,
-                    timestamp=datetime.now().isoformat(),
                     data=data,
                     steps=[
                         f"统计函数: {func_name}",
-                        f"数据: {data}",
+                        _describe_data(data),
                         f"结果: {result}"
                     ]
                 )
@@ -525,7 +891,6 @@ class UnifiedCalculator:
                 operation="error",
                 expression=expression,
                 result=float('nan'),
-                timestamp=datetime.now().isoformat(),
                 error=f"统计计算失败: {str(e)}"
             )
 
@@ -541,22 +906,18 @@ class UnifiedCalculator:
         Returns:
             包含所有计算结果的 UnifiedCalculationResult 对象，
             result 字段为结果列表，batch_results 包含详细信息
+
+        Note:
+            整个批次只生成一次时间戳，所有子表达式结果共享该时间戳
         """
+        # 批次结果及其子结果在构建时都读取这一个共享时间戳
+        token = _BATCH_TIMESTAMP.set(datetime.now().isoformat())
         try:
             # 分割表达式，移除空行
             expr_list = [expr.strip() for expr in expressions.split(';') if expr.strip()]
 
-            batch_results = []
-            # 递归处理每个表达式
-            for expr in expr_list:
-                expr_type = self.detect_expression_type(expr)
-                if expr_type == "linear_equation":
-                    result = self.solve_linear_equation(expr, "x")
-                elif expr_type == "statistics":
-                    result = self.calculate_statistics(expr)
-                else:
-                    result = self.evaluate_expression(expr)
-                batch_results.append(result)
+            # 逐个处理每个表达式
+            batch_results = [self.dispatch(expr) for expr in expr_list]
 
             # 提取所有成功计算的结果值
             results_values = [r.result for r in batch_results if r.operation != "error"]
@@ -565,11 +926,10 @@ class UnifiedCalculator:
                 operation="batch_calculation",
                 expression=expressions,
                 result=results_values,
-                timestamp=datetime.now().isoformat(),
                 batch_results=batch_results,
                 steps=[
                     f"批量处理 {len(expr_list)} 个表达式",
-                    *[f"  {i+1}. {r.expression} = {r.result}" for i, r in enumerate(batch_results)]
+                    *[f"{i+1}. {r.expression} = {r.result}" for i, r in enumerate(batch_results)]
                 ]
             )
         except Exception as e:
@@ -577,11 +937,12 @@ class UnifiedCalculator:
                 operation="error",
                 expression=expressions,
                 result=[],
-                timestamp=datetime.now().isoformat(),
                 error=f"批量计算失败: {str(e)}"
             )
+        finally:
+            _BATCH_TIMESTAMP.reset(token)
 
-    def _eval_node(self, node):
+    def _eval_node(self, node: ast.AST) -> float:
         """递归评估 AST 节点。
         
         安全地评估抽象语法树节点，仅支持白名单内的运算符和函数。
@@ -597,83 +958,72 @@ class UnifiedCalculator:
             ValueError: 当遇到不支持的节点类型、运算符或函数时
             
         Supported Node Types:
-            - Constant/Num: 数值常量
+            - Constant: 数值常量
             - BinOp: 二元运算（+、-、*、/、**、//、%）
             - UnaryOp: 一元运算（+、-）
-            - Call: 函数调用（仅白名单函数）
+            - Call: 函数调用（仅白名单函数，参数可为列表字面量，如 max([1, 5, 3])）
             - Name: 变量引用（仅白名单常数）
         """
-        # 处理常量节点（Python 3.8+）
-        if isinstance(node, ast.Constant):
-            if isinstance(node.value, (int, float)):
-                return float(node.value)
-            else:
-                raise ValueError(f"不支持的常量类型: {type(node.value)}")
-        
-        # 兼容旧版本 Python（< 3.8）
-        elif hasattr(ast, 'Num') and isinstance(node, ast.Num):
-            return float(node.n)
-        
-        # 处理二元运算符
-        elif isinstance(node, ast.BinOp):
-            left = self._eval_node(node.left)
-            right = self._eval_node(node.right)
-
-            if isinstance(node.op, ast.Add):
-                return left + right
-            elif isinstance(node.op, ast.Sub):
-                return left - right
-            elif isinstance(node.op, ast.Mult):
-                return left * right
-            elif isinstance(node.op, ast.Div):
-                if right == 0:
-                    raise ValueError("除数不能为零")
-                return left / right
-            elif isinstance(node.op, ast.Pow):
-                return left ** right
-            elif isinstance(node.op, ast.FloorDiv):
-                if right == 0:
-                    raise ValueError("除数不能为零")
-                return left // right
-            elif isinstance(node.op, ast.Mod):
-                if right == 0:
-                    raise ValueError("除数不能为零")
-                return left % right
-            else:
-                raise ValueError(f"不支持的运算符: {type(node.op)}")
-        
-        # 处理一元运算符
-        elif isinstance(node, ast.UnaryOp):
-            operand = self._eval_node(node.operand)
-            if isinstance(node.op, ast.UAdd):
-                return +operand
-            elif isinstance(node.op, ast.USub):
-                return -operand
-            else:
-                raise ValueError(f"不支持的一元运算符: {type(node.op)}")
-        
-        # 处理函数调用
-        elif isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name):
-                func_name = node.func.id
-                if func_name in self.safe_functions:
-                    args = [self._eval_node(arg) for arg in node.args]
-                    return self.safe_functions[func_name](*args)
-                else:
-                    raise ValueError(f"不支持的函数: {func_name}")
-            else:
-                raise ValueError("不支持的函数调用形式")
-        
-        # 处理变量引用（仅允许白名单常数）
-        elif isinstance(node, ast.Name):
-            if node.id in self.safe_constants:
-                return self.safe_constants[node.id]
-            else:
-                raise ValueError(f"不支持的变量或常数: {node.id}")
-        
-        # 不支持的节点类型
-        else:
+        handler = self._NODE_HANDLERS.get(type(node))
+        if handler is None:
             raise ValueError(f"不支持的AST节点类型: {type(node)}")
+        return handler(self, node)
+
+    def _eval_constant(self, node: ast.Constant) -> float:
+        """评估数值常量节点。"""
+        if isinstance(node.value, (int, float)):
+            return float(node.value)
+        raise ValueError(f"不支持的常量类型: {type(node.value)}")
+
+    def _eval_binop(self, node: ast.BinOp) -> float:
+        """评估二元运算节点（+、-、*、/、**、//、%）。"""
+        left = self._eval_node(node.left)
+        right = self._eval_node(node.right)
+
+        op_func = _BINARY_OPERATORS.get(type(node.op))
+        if op_func is None:
+            raise ValueError(f"不支持的运算符: {type(node.op)}")
+        if right == 0 and isinstance(node.op, _DIVISION_OPERATORS):
+            raise ValueError("除数不能为零")
+        return op_func(left, right)
+
+    def _eval_unaryop(self, node: ast.UnaryOp) -> float:
+        """评估一元运算节点（+、-）。"""
+        operand = self._eval_node(node.operand)
+        op_func = _UNARY_OPERATORS.get(type(node.op))
+        if op_func is None:
+            raise ValueError(f"不支持的一元运算符: {type(node.op)}")
+        return op_func(operand)
+
+    def _eval_call(self, node: ast.Call) -> float:
+        """评估函数调用节点（仅允许白名单函数）。"""
+        if not isinstance(node.func, ast.Name):
+            raise ValueError("不支持的函数调用形式")
+        func = self.safe_functions.get(node.func.id)
+        if func is None:
+            raise ValueError(f"不支持的函数: {node.func.id}")
+        # 列表字面量参数按元素求值后整体传入，用于 sum、max、min、len 等聚合函数
+        args = [
+            [self._eval_node(elt) for elt in arg.elts] if isinstance(arg, ast.List)
+            else self._eval_node(arg)
+            for arg in node.args
+        ]
+        return func(*args)
+
+    def _eval_name(self, node: ast.Name) -> float:
+        """评估变量引用节点（仅允许白名单常数）。"""
+        if node.id in self.safe_constants:
+            return self.safe_constants[node.id]
+        raise ValueError(f"不支持的变量或常数: {node.id}")
+
+    # AST 节点类型 -> 评估方法的分派表，按 type(node) 一次查找
+    _NODE_HANDLERS: Dict[type, Callable[["UnifiedCalculator", Any], float]] = {
+        ast.Constant: _eval_constant,
+        ast.BinOp: _eval_binop,
+        ast.UnaryOp: _eval_unaryop,
+        ast.Call: _eval_call,
+        ast.Name: _eval_name,
+    }
 
     def _evaluate_simple_expression(self, expr: str) -> float:
         """评估简单的数学表达式。
@@ -688,8 +1038,15 @@ class UnifiedCalculator:
             表达式的计算结果（float 类型）
             
         Note:
-            此方法使用受限的 eval，仅允许白名单内的名称和函数
+            纯数字直接转换；其余情况使用受限的 eval（保留整数精确运算），
+            仅允许白名单内的名称和函数
         """
+        # 快速路径：等号右侧通常是纯数字
+        try:
+            return float(expr)
+        except ValueError:
+            pass
+
         try:
             # 处理空表达式
             if not expr or expr.strip() == '':
@@ -699,17 +1056,9 @@ class UnifiedCalculator:
             expr = expr.replace('pi', str(math.pi))
             expr = expr.replace('e', str(math.e))
 
-            # 限制 eval 的命名空间，仅允许安全的函数和常数
-            allowed_names = {
-                'pi': math.pi,
-                'e': math.e,
-                'sqrt': math.sqrt,
-                'abs': abs,
-                'pow': pow,
-            }
-
-            # 执行受限的 eval
-            result = eval(expr, {"__builtins__": {}}, allowed_names)
+            # 执行受限的 eval，仅允许安全的函数和常数
+            # （每次调用使用新的全局命名空间，避免表达式修改后影响后续请求）
+            result = eval(expr, {"__builtins__": {}}, _SIMPLE_EVAL_NAMES)
             return float(result)
         except:
             # 解析失败时尝试直接转换为数字
@@ -719,6 +1068,90 @@ class UnifiedCalculator:
                 return 0.0
 
 
+# 进程内共享的计算器实例（计算器无状态，可安全复用）
+_CALCULATOR = UnifiedCalculator()
+
+
+@lru_cache(maxsize=1024)
+def _evaluate_value(expression: str) -> float:
+    """计算表达式的数值结果并按表达式字符串缓存。
+
+    表达式求值是纯函数（白名单内的函数和常数均无副作用，AST 遍历只使用
+    类级状态），因此在模块级按表达式缓存，并使用共享计算器实例遍历语法树；
+    时间戳在缓存之外生成。求值失败时抛出的异常不会被缓存。
+
+    Args:
+        expression: 数学表达式字符串
+
+    Returns:
+        表达式的计算结果（float 类型）
+    """
+    return float(_CALCULATOR._eval_node(_parse_expression(expression)))
+
+
+# ========== Markdown 响应模板 ==========
+
+def _md_error(result: UnifiedCalculationResult) -> str:
+    """生成计算错误的 Markdown 响应。"""
+    return (
+        f"❌ **计算错误**\n\n"
+        f"**表达式**: `{result.expression}`\n"
+        f"**错误**: {result.error}"
+    )
+
+
+def _md_render(result: UnifiedCalculationResult, body: str) -> str:
+    """将结果主体与标题、计算步骤和时间戳组装为完整的 Markdown 响应。
+
+    Args:
+        result: 计算结果对象
+        body: 各操作类型对应的结果主体（含小节标题）
+
+    Returns:
+        完整的 Markdown 字符串
+    """
+    steps = ""
+    if result.steps:
+        # 列表项前缀并入分隔符，只需一次 join，无需逐条格式化
+        steps = "\n\n## 计算步骤\n\n- " + "\n- ".join(result.steps)
+    return (
+        f"# 🧮 计算结果\n\n"
+        f"**表达式**: `{result.expression}`\n"
+        f"**操作类型**: {result.operation}\n\n"
+        f"{body}{steps}\n\n"
+        f"---\n"
+        f"*计算时间: {result.timestamp}*"
+    )
+
+
+def _md_expression(result: UnifiedCalculationResult) -> str:
+    """生成单个结果（表达式求值、统计计算）的 Markdown 响应。"""
+    return _md_render(result, f"## 结果\n\n### {result.result}")
+
+
+def _md_equation(result: UnifiedCalculationResult, variable: str) -> str:
+    """生成线性方程求解结果的 Markdown 响应。"""
+    return _md_render(result, f"## 方程求解结果\n\n**{variable}** = **{result.result}**")
+
+
+def _md_batch(result: UnifiedCalculationResult) -> str:
+    """生成批量计算结果的 Markdown 响应。"""
+    items = "\n".join([
+        f"{i}. `{br.expression}` = **{val}**"
+        for i, (val, br) in enumerate(zip(result.result, result.batch_results), 1)
+    ])
+    if not items:
+        # 没有成功结果时保留原有的单个空行，与逐行拼接时的输出一致
+        return _md_render(result, "## 批量计算结果\n")
+    return _md_render(result, f"## 批量计算结果\n\n{items}")
+
+
+def _md_truncate(markdown_str: str) -> str:
+    """按行保留前一半内容并追加截断提示。"""
+    lines = markdown_str.split("\n")
+    return "\n".join(lines[:len(lines) // 2]) + "\n\n⚠️ *响应因长度限制被截断*"
+
+
 # ========== MCP 工具定义 ==========
 
 @mcp.tool(
@@ -826,49 +1259,45 @@ def calculate(
         - 方程必须包含等号，且变量默认为 x
         - 超长响应会被自动截断，截断阈值为 CHARACTER_LIMIT
     """
-    # 验证输入参数
-    try:
-        validated_input = CalculateInput(
-            expression=expression,
-            variable=variable,
-            response_format=response_format
-        )
-    except Exception as e:
-        error_msg = f"输入验证失败: {str(e)}"
-        if response_format == ResponseFormat.JSON:
-            import json
-            error_result = {
-                "operation": "error",
-                "expression": expression,
-                "result": float('nan'),
-                "timestamp": datetime.now().isoformat(),
-                "error": error_msg
-            }
-            return json.dumps(error_result, indent=2, ensure_ascii=False)
-        else:
-            return f"❌ **错误**: {error_msg}"
-
-    # 创建计算器实例并检测表达式类型
-    calculator = UnifiedCalculator()
-    expression_type = calculator.detect_expression_type(validated_input.expression)
+    # 验证输入参数：先做与 CalculateInput 等价的轻量检查，全部通过时无需构建模型
+    stripped_expression = expression.strip() if type(expression) is str else ""
+    stripped_variable = variable.strip() if type(variable) is str else ""
+    if (0 < len(stripped_expression) <= 1000
+            and len(stripped_variable) <= 10
+            and _VARIABLE_NAME_RE.fullmatch(stripped_variable)
+            and isinstance(response_format, ResponseFormat)):
+        expression, variable = stripped_expression, stripped_variable
+    else:
+        # 轻量检查未通过时使用完整的 Pydantic 校验，以得到一致的错误信息
+        try:
+            validated_input = CalculateInput(
+                expression=expression,
+                variable=variable,
+                response_format=response_format
+            )
+        except Exception as e:
+            error_msg = f"输入验证失败: {str(e)}"
+            if response_format == ResponseFormat.JSON:
+                error_result = {
+                    "operation": "error",
+                    "expression": expression,
+                    "result": float('nan'),
+                    "timestamp": datetime.now().isoformat(),
+                    "error": error_msg
+                }
+                return json.dumps(error_result, indent=2, ensure_ascii=False)
+            else:
+                return f"❌ **错误**: {error_msg}"
+        expression = validated_input.expression
+        variable = validated_input.variable
+        response_format = validated_input.response_format
 
-    # 根据表达式类型执行相应计算
+    # 检测表达式类型并执行相应计算
     try:
-        if expression_type == "linear_equation":
-            result = calculator.solve_linear_equation(
-                validated_input.expression,
-                validated_input.variable
-            )
-        elif expression_type == "batch_calculation":
-            result = calculator.process_batch(validated_input.expression)
-        elif expression_type == "statistics":
-            result = calculator.calculate_statistics(validated_input.expression)
-        else:
-            result = calculator.evaluate_expression(validated_input.expression)
+        result = _CALCULATOR.dispatch(expression, variable)
 
         # 根据输出格式生成响应
-        if validated_input.response_format == ResponseFormat.JSON:
-            import json
+        if response_format == ResponseFormat.JSON:
             # 构建 JSON 结果字典
             result_dict = {
                 "operation": result.operation,
@@ -889,10 +1318,25 @@ def calculate(
                     } for br in result.batch_results
                 ]
 
-            json_str = json.dumps(result_dict, indent=2, ensure_ascii=False)
+            # 结果或输入数据中存在 NaN/Infinity（如批量计算中的失败项）时使用标准库序列化
+            values: List[Any] = result.result if isinstance(result.result, list) else [result.result]
+            if result.batch_results is not None:
+                values = [br.result for br in result.batch_results]
+            fast = all(map(math.isfinite, values))
+            if fast and result.data is not None:
+                fast = all(map(math.isfinite, result.data))
+
+            # 每个批量条目序列化后至少占 80 个字符加表达式长度；
+            # 该下界已超出限制时必然截断，无需先完整序列化一次
+            over_limit = result.batch_results is not None and sum(
+                len(br.expression) + 80 for br in result.batch_results
+            ) > CHARACTER_LIMIT
+            if not over_limit:
+                json_str = _json_dumps(result_dict, fast)
+                over_limit = len(json_str) > CHARACTER_LIMIT
 
             # 检查字符数限制
-            if len(json_str) > CHARACTER_LIMIT:
+            if over_limit:
                 # 截断结果列表
                 if isinstance(result_dict["result"], list):
                     result_dict["result"] = result_dict["result"][:len(result_dict["result"])//2]
@@ -901,74 +1345,35 @@ def calculate(
                     f"响应因超过 {CHARACTER_LIMIT} 字符限制而被截断。"
                     "对于批量计算，请考虑减少表达式数量。"
                 )
-                json_str = json.dumps(result_dict, indent=2, ensure_ascii=False)
+                json_str = _json_dumps(result_dict, fast)
 
             return json_str
 
         else:
             # Markdown 格式输出
             if result.error:
-                return (
-                    f"❌ **计算错误**\n\n"
-                    f"**表达式**: `{result.expression}`\n"
-                    f"**错误**: {result.error}"
-                )
-
-            # 构建 Markdown 格式的成功结果
-            lines = [f"# 🧮 计算结果", ""]
-            lines.append(f"**表达式**: `{result.expression}`")
-            lines.append(f"**操作类型**: {result.operation}")
+                return _md_error(result)
 
-            # 根据操作类型显示不同的结果格式
+            # 根据操作类型选择对应的 Markdown 模板
             if result.operation == "batch_calculation" and isinstance(result.result, list):
-                lines.append("")
-                lines.append("## 批量计算结果")
-                lines.append("")
-                for i, val in enumerate(result.result, 1):
-                    lines.append(f"{i}. `{result.batch_results[i-1].expression}` = **{val}**")
+                markdown_str = _md_batch(result)
             elif result.operation == "linear_equation":
-                lines.append("")
-                lines.append(f"## 方程求解结果")
-                lines.append("")
-                lines.append(f"**{validated_input.variable}** = **{result.result}**")
+                markdown_str = _md_equation(result, variable)
             else:
-                lines.append("")
-                lines.append(f"## 结果")
-                lines.append("")
-                lines.append(f"### {result.result}")
-
-            # 显示计算步骤
-            if result.steps:
-                lines.append("")
-                lines.append("## 计算步骤")
-                lines.append("")
-                for step in result.steps:
-                    lines.append(f"- {step}")
-
-            # 显示时间戳
-            lines.append("")
-            lines.append(f"---")
-            lines.append(f"*计算时间: {result.timestamp}*")
-
-            markdown_str = "\n".join(lines)
+                markdown_str = _md_expression(result)
 
             # 检查字符数限制
             if len(markdown_str) > CHARACTER_LIMIT:
-                # 截断内容
-                lines = lines[:len(lines)//2]
-                lines.append("")
-                lines.append("⚠️ *响应因长度限制被截断*")
-                markdown_str = "\n".join(lines)
+                markdown_str = _md_truncate(markdown_str)
 
             return markdown_str
 
     except Exception as e:
         error_msg = f"计算失败: {str(e)}"
-        if validated_input.response_format == ResponseFormat.JSON:
-            import json
+        if response_format == ResponseFormat.JSON:
             error_result = {
                 "operation": "error",
-                "expression": validated_input.expression,
+                "expression": expression,
                 "result": float('nan'),
                 "timestamp": datetime.now().isoformat(),
                 "error": error_msg
@@ -980,6 +1385,51 @@ def calculate(
 
 # ========== MCP 资源定义 ==========
 
+def _md_resource(title: str, lines: Iterable[str]) -> str:
+    """将标题与正文行渲染为资源 Markdown 文本（单次 join，避免字符串拼接）。
+
+    Args:
+        title: 一级标题文本
+        lines: 正文行，可以是生成器
+
+    Returns:
+        以换行结尾的 Markdown 字符串
+    """
+    buf = [f"# {title}", ""]
+    buf.extend(lines)
+    return "\n".join(buf) + "\n"
+
+
+# 常用数学常数（名称与数值的不可变元组，导入时生成一次 Markdown）
+_MATH_CONSTANTS: Tuple[Tuple[str, str], ...] = (
+    ("π (Pi)", "3.14159265359"),
+    ("e (Euler's Number)", "2.71828182846"),
+    ("φ (Golden Ratio)", "1.61803398875"),
+    ("√2 (Square Root of 2)", "1.41421356237"),
+    ("√3 (Square Root of 3)", "1.73205080757"),
+)
+
+_CONSTANTS_MARKDOWN = _md_resource(
+    "Mathematical Constants",
+    (f"- **{name}**: {value}" for name, value in _MATH_CONSTANTS)
+)
+
+# 常用数学公式（静态内容，导入时生成一次 Markdown）
+_COMMON_FORMULAS = [
+    "Area of Circle: A = πr²",
+    "Area of Triangle: A = ½bh",
+    "Quadratic Formula: x = (-b ± √(b²-4ac)) / 2a",
+    "Pythagorean Theorem: a² + b² = c²",
+    "Distance Formula: d = √[(x₂-x₁)² + (y₂-y₁)²]",
+    "Slope Formula: m = (y₂-y₁) / (x₂-x₁)"
+]
+
+_FORMULAS_MARKDOWN = _md_resource(
+    "Common Mathematical Formulas",
+    (f"{i}. {formula}" for i, formula in enumerate(_COMMON_FORMULAS, 1))
+)
+
+
 @mcp.resource("calculator://constants")
 def get_mathematical_constants() -> str:
     """获取常用数学常数列表。
@@ -996,19 +1446,7 @@ def get_mathematical_constants() -> str:
         - √2: 2的平方根
         - √3: 3的平方根
     """
-    constants = {
-        "π (Pi)": "3.14159265359",
-        "e (Euler's Number)": "2.71828182846",
-        "φ (Golden Ratio)": "1.61803398875",
-        "√2 (Square Root of 2)": "1.41421356237",
-        "√3 (Square Root of 3)": "1.73205080757"
-    }
-
-    content = "# Mathematical Constants\n\n"
-    for name, value in constants.items():
-        content += f"- **{name}**: {value}\n"
-
-    return content
+    return _CONSTANTS_MARKDOWN
 
 
 @mcp.resource("calculator://formulas")
@@ -1028,46 +1466,15 @@ def get_common_formulas() -> str:
         - 平面距离公式
         - 直线斜率公式
     """
-    formulas = [
-        "Area of Circle: A = πr²",
-        "Area of Triangle: A = ½bh",
-        "Quadratic Formula: x = (-b ± √(b²-4ac)) / 2a",
-        "Pythagorean Theorem: a² + b² = c²",
-        "Distance Formula: d = √[(x₂-x₁)² + (y₂-y₁)²]",
-        "Slope Formula: m = (y₂-y₁) / (x₂-x₁)"
-    ]
-
-    content = "# Common Mathematical Formulas\n\n"
-    for i, formula in enumerate(formulas, 1):
-        content += f"{i}. {formula}\n"
-
-    return content
+    return _FORMULAS_MARKDOWN
 
 
 # ========== MCP 提示定义 ==========
 
-@mcp.prompt()
-def math_problem_solver(problem: str) -> str:
-    """生成数学问题的结构化解题方法提示。
-    
-    为给定的数学问题提供系统化的解题指导框架，
-    帮助用户理解问题、选择方法、执行求解并验证结果。
-    
-    Args:
-        problem: 待解决的数学问题描述
-    
-    Returns:
-        包含结构化解题步骤的提示文本，指导用户完成问题求解
-    
-    Prompt Structure:
-        1. 理解问题（目标、已知信息、约束条件）
-        2. 识别方法（适用概念、相关公式、推荐方法）
-        3. 逐步求解（清晰计算、推理说明、步骤验证）
-        4. 最终答案（结果陈述、合理性检查、备选方法）
-    """
-    prompt_content = f"""You are a mathematical problem solver. Please help solve this problem:
+# 提示模板（静态部分仅定义一次，调用时用 % 替换唯一的 %s 占位符；模板正文中不可出现其他 % 字符）
+_SOLVER_PROMPT_TEMPLATE = """You are a mathematical problem solver. Please help solve this problem:
 
-**Problem:** {problem}
+**Problem:** %s
 
 **Structured Approach:**
 1. **Understand the Problem**
@@ -1092,7 +1499,52 @@ def math_problem_solver(problem: str) -> str:
 
 Please provide a detailed, educational solution."""
 
-    return prompt_content
+_CHECKER_PROMPT_TEMPLATE = """Please review and explain this mathematical calculation:
+
+**Calculation:** %s
+
+**Please provide:**
+1. **Verification** - Is the calculation correct?
+2. **Step-by-step breakdown** - Show how to arrive at the result
+3. **Method explanation** - What mathematical principles are being used?
+4. **Alternative approaches** - Are there other ways to solve this?
+5. **Common pitfalls** - What mistakes should be avoided in similar calculations?
+
+Provide an educational explanation that helps understand both the process and the underlying mathematics."""
+
+
+@lru_cache(maxsize=256)
+def _solver_prompt(problem: str) -> str:
+    """填充解题提示模板并缓存结果（重试或多次请求相同问题时直接复用）。"""
+    return _SOLVER_PROMPT_TEMPLATE % (problem,)
+
+
+@lru_cache(maxsize=256)
+def _checker_prompt(calculation: str) -> str:
+    """填充计算验证提示模板并缓存结果。"""
+    return _CHECKER_PROMPT_TEMPLATE % (calculation,)
+
+
+@mcp.prompt()
+def math_problem_solver(problem: str) -> str:
+    """生成数学问题的结构化解题方法提示。
+    
+    为给定的数学问题提供系统化的解题指导框架，
+    帮助用户理解问题、选择方法、执行求解并验证结果。
+    
+    Args:
+        problem: 待解决的数学问题描述
+    
+    Returns:
+        包含结构化解题步骤的提示文本，指导用户完成问题求解
+    
+    Prompt Structure:
+        1. 理解问题（目标、已知信息、约束条件）
+        2. 识别方法（适用概念、相关公式、推荐方法）
+        3. 逐步求解（清晰计算、推理说明、步骤验证）
+        4. 最终答案（结果陈述、合理性检查、备选方法）
+    """
+    return _solver_prompt(problem)
 
 
 @mcp.prompt()
@@ -1115,20 +1567,7 @@ def calculation_checker(calculation: str) -> str:
         4. 提供替代解法
         5. 指出常见错误
     """
-    prompt_content = f"""Please review and explain this mathematical calculation:
-
-**Calculation:** {calculation}
-
-**Please provide:**
-1. **Verification** - Is the calculation correct?
-2. **Step-by-step breakdown** - Show how to arrive at the result
-3. **Method explanation** - What mathematical principles are being used?
-4. **Alternative approaches** - Are there other ways to solve this?
-5. **Common pitfalls** - What mistakes should be avoided in similar calculations?
-
-Provide an educational explanation that helps understand both the process and the underlying mathematics."""
-
-    return prompt_content
+    return _checker_prompt(calculation)
 
 
 # ========== 主程序入口 ==========
@@ -1142,8 +1581,10 @@ def cli_main():
     Note:
         调用 mcp.run() 会启动服务器并阻塞当前线程，
         直到收到终止信号或发生错误。
+        默认的 stdio 传输使用标准输出传递协议消息，启动信息因此写入标准错误。
     """
-    print("Starting Calculator MCP Server with FastMCP...")
+    sys.stderr.write("Starting Calculator MCP Server with FastMCP...\n")
+    sys.stderr.flush()
     mcp.run()
 
 
@@ -0,0 +1,59 @@
+"""
+表达式求值回归测试
+
+覆盖聚合函数（sum、max、min、len）的列表参数写法与 sum 的精确求和语义。
+"""
+
+import math
+
+import pytest
+
+from calculator_mcp.server import UnifiedCalculator
+
+
+@pytest.fixture
+def calculator() -> UnifiedCalculator:
+    """提供计算器实例。"""
+    return UnifiedCalculator()
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("sum([1, 2, 3])", 6.0),
+        ("sum([0.1, 0.2, 0.3])", 0.6),
+        ("sum([])", 0.0),
+        ("max([1, 5, 3])", 5.0),
+        ("min([1, 5, 3])", 1.0),
+        ("len([1, 2, 3, 4])", 4.0),
+        ("sum([1, 2]) * 2 + max(1, 2)", 8.0),
+    ],
+)
+def test_aggregate_functions_accept_lists(calculator, expression, expected):
+    """README 中记载的列表参数写法应可直接求值，sum 应精确求和。"""
+    result = calculator.evaluate_expression(expression)
+
+    assert result.error is None
+    assert result.result == expected
+
+
+def test_sum_overflow_returns_infinity(calculator):
+    """math.fsum 中间结果溢出时应回退到内置 sum，而不是返回错误。"""
+    result = calculator.evaluate_expression("sum([1e308, 1e308])")
+
+    assert result.error is None
+    assert math.isinf(result.result)
+
+
+def test_sum_requires_a_list(calculator):
+    """sum 只接受一个列表参数，与 README 中的用法一致。"""
+    result = calculator.evaluate_expression("sum(1, 2, 3)")
+
+    assert result.operation == "error"
+
+
+def test_batch_with_aggregate_functions(calculator):
+    """README 中的混合统计批量示例应全部计算成功。"""
+    result = calculator.process_batch("sum([1,2,3]); mean([4,5,6]); max([7,8,9])")
+
+    assert result.result == [6.0, 5.0, 9.0]
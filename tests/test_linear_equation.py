@@ -0,0 +1,104 @@
+"""
+线性方程求解回归测试
+
+覆盖基于 AST 的方程左侧解析（隐式乘号、同类项合并、减法与负常数、
+以 Python 关键字为变量名），以及变量名与方程不符时的错误信息。
+"""
+
+import math
+
+import pytest
+
+from calculator_mcp.server import UnifiedCalculator
+
+
+@pytest.fixture
+def calculator() -> UnifiedCalculator:
+    """提供计算器实例。"""
+    return UnifiedCalculator()
+
+
+@pytest.mark.parametrize(
+    ("equation", "variable", "expected"),
+    [
+        ("x + x = 4", "x", 2.0),
+        ("10 - x = 3", "x", 7.0),
+        ("2 * x + 3 = 7", "x", 2.0),
+        ("x - 5 = -10", "x", -5.0),
+        ("2x + 3 = 7", "x", 2.0),
+        ("2 x + 3 = 7", "x", 2.0),
+        ("(1+2)x = 6", "x", 2.0),
+        ("-2.5x - 1 = 4", "x", -2.0),
+        (".5x = 1", "x", 2.0),
+        ("x/2 + 1 = 3", "x", 4.0),
+        ("3*(x+1) = 9", "x", 2.0),
+        ("3*y - 5 = 10", "y", 5.0),
+        ("2y + 1 = 5", "y", 2.0),
+        ("x = 12345678901234567891 - 12345678901234567890", "x", 1.0),
+        ("2in + 3 = 7", "in", 2.0),
+        ("if - 1 = 4", "if", 5.0),
+        ("3or = 9", "or", 3.0),
+        ("2is + 1 = 5", "is", 2.0),
+        ("as/2 = 3", "as", 6.0),
+    ],
+)
+def test_solves_linear_equation(calculator, equation, variable, expected):
+    """线性方程应得到正确的解。"""
+    result = calculator.solve_linear_equation(equation, variable)
+
+    assert result.error is None
+    assert result.operation == "linear_equation"
+    assert result.result == pytest.approx(expected)
+
+
+def test_negated_variable_steps_have_no_negative_zero(calculator):
+    """"-x" 的常数项应显示为 0.0，而不是 -0.0。"""
+    result = calculator.solve_linear_equation("-x = 3", "x")
+
+    assert result.result == -3.0
+    assert result.steps[1] == "解析: -1.0x + 0.0 = 3.0"
+    assert result.steps[2] == "移项: -1.0x = 3.0 - 0.0"
+
+
+@pytest.mark.parametrize(
+    ("equation", "variable"),
+    [
+        ("2x + 3 = 7", "y"),
+        ("0x = 5", "y"),
+    ],
+)
+def test_wrong_variable_reports_clear_error(calculator, equation, variable):
+    """变量名与方程不符时应给出明确提示，而不是原始的语法错误信息。"""
+    result = calculator.solve_linear_equation(equation, variable)
+
+    assert result.operation == "error"
+    assert math.isnan(result.result)
+    assert f"变量 {variable}" in result.error
+    assert "literal" not in result.error
+
+
+@pytest.mark.parametrize(
+    ("equation", "message"),
+    [
+        ("x*x = 4", "方程必须是线性的"),
+        ("0x = 5", "方程中必须包含变量 x"),
+        ("x/0 = 1", "除数不能为零"),
+        ("1 = 2 = 3", "方程必须包含一个等号"),
+    ],
+)
+def test_invalid_equation_errors(calculator, equation, message):
+    """非线性、零系数、除零和多等号的方程应返回对应的错误信息。"""
+    result = calculator.solve_linear_equation(equation, "x")
+
+    assert result.operation == "error"
+    assert message in result.error
+
+
+def test_right_side_eval_does_not_leak_between_calls(calculator):
+    """等号右侧的受限 eval 不应让一次请求修改后续请求使用的命名空间。"""
+    injection = "x = (lambda:0).__globals__.__ior__({'round':lambda v:42}) and 7"
+    calculator.solve_linear_equation(injection, "x")
+
+    result = calculator.solve_linear_equation("x = round(2.5)", "x")
+
+    assert result.result == 0.0
@@ -0,0 +1,64 @@
+"""
+统计计算回归测试
+
+覆盖纯 Python 快速路径（math.fsum 均值与两遍方差算法）的结果精度，
+以及中间结果溢出时回退到 statistics 模块的行为。
+"""
+
+import statistics
+
+import pytest
+
+from calculator_mcp.server import UnifiedCalculator
+
+
+@pytest.fixture
+def calculator() -> UnifiedCalculator:
+    """提供计算器实例。"""
+    return UnifiedCalculator()
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("mean([0.1, 0.2, 0.3])", 0.2),
+        ("mean([1, 2, 3, 4, 5])", 3.0),
+        ("median([3, 1, 2])", 2.0),
+        ("mode([1, 2, 2, 3])", 2.0),
+        ("variance([2, 4, 4, 4, 5, 5, 7, 9])", statistics.variance([2, 4, 4, 4, 5, 5, 7, 9])),
+        ("stdev([2, 4, 4, 4, 5, 5, 7, 9])", statistics.stdev([2, 4, 4, 4, 5, 5, 7, 9])),
+        ("stdev([5])", 0.0),
+        ("variance([5])", 0.0),
+    ],
+)
+def test_statistics_results(calculator, expression, expected):
+    """统计结果应与 statistics 模块一致，均值不应出现二次舍入误差。"""
+    result = calculator.calculate_statistics(expression)
+
+    assert result.error is None
+    assert result.operation == "statistics"
+    assert result.result == expected
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("mean([1e308, 1e308])", statistics.mean([1e308, 1e308])),
+        ("stdev([1e200, -1e200])", statistics.stdev([1e200, -1e200])),
+        ("variance([1e308, 1e308])", statistics.variance([1e308, 1e308])),
+    ],
+)
+def test_overflow_falls_back_to_statistics_module(calculator, expression, expected):
+    """快速路径的中间结果溢出时应回退到 statistics 模块，而不是返回错误。"""
+    result = calculator.calculate_statistics(expression)
+
+    assert result.error is None
+    assert result.result == pytest.approx(expected)
+
+
+def test_large_data_steps_show_count_and_endpoints(calculator):
+    """数据点较多时，计算步骤中仅显示数量与首末项。"""
+    data = ", ".join(str(i) for i in range(1, 201))
+    result = calculator.calculate_statistics(f"mean([{data}])")
+
+    assert result.steps[1] == "数据: 共 200 个数据点（1.0, ..., 200.0）"